@@ -1,15 +1,36 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import argparse
+import hashlib
+import io
+import json
 import signal
+import socket
 import os
+import queue
+import re
 import sys
 import time
 import subprocess
+import tarfile
 import logging
 import shutil
-
-def print_header():
-    header_text = """
+import tempfile
+import threading
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import closing
+from urllib.parse import urlsplit
+
+# orjson is optional; it parses ffprobe output and long check logs faster than the standard library
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
+
+# Startup banner, written in one go by print_header
+HEADER = """
 \033[96m██╗██████╗ ████████╗██╗   ██╗     ██████╗██╗  ██╗███████╗ ██████╗██╗  ██╗███████╗██████╗   
 ██║██╔══██╗╚══██╔══╝██║   ██║    ██╔════╝██║  ██║██╔════╝██╔════╝██║ ██╔╝██╔════╝██╔══██╗  
 ██║██████╔╝   ██║   ██║   ██║    ██║     ███████║█████╗  ██║     █████╔╝ █████╗  ██████╔╝  
@@ -17,10 +38,22 @@ def print_header():
 ██║██║        ██║    ╚████╔╝     ╚██████╗██║  ██║███████╗╚██████╗██║  ██╗███████╗██║  ██║  
 ╚═╝╚═╝        ╚═╝     ╚═══╝       ╚═════╝╚═╝  ╚═╝╚══════╝ ╚═════╝╚═╝  ╚═╝╚══════╝╚═╝  ╚═╝  
 \033[0m    
-""" 
-    print(header_text)
-    print("\033[93mWelcome to the IPTV Stream Checker!\n\033[0m")
-    print("\033[93mUse -h for help on how to use this tool.\033[0m")
+
+\033[93mWelcome to the IPTV Stream Checker!
+\033[0m
+\033[93mUse -h for help on how to use this tool.\033[0m
+"""
+
+# ANSI colors for the console output; left out when stdout isn't a terminal so redirected output stays plain
+USE_COLOR = sys.stdout.isatty()
+ALIVE_COLOR = "\033[92m" if USE_COLOR else ""
+DEAD_COLOR = "\033[91m" if USE_COLOR else ""
+WARNING_COLOR = "\033[93m" if USE_COLOR else ""
+RESET_COLOR = "\033[0m" if USE_COLOR else ""
+ANSI_ESCAPE_PATTERN = re.compile(r'\033\[\d+m')
+
+def print_header():
+    sys.stdout.write(HEADER if USE_COLOR else ANSI_ESCAPE_PATTERN.sub('', HEADER))
 
 def setup_logging(verbose_level):
     if verbose_level == 1:
@@ -30,55 +63,174 @@ def setup_logging(verbose_level):
     else:
         logging.basicConfig(level=logging.CRITICAL)  # Only critical errors will be logged by default.
 
+# Set on the first Ctrl+C: workers stop picking up new work and running ffmpeg/ffprobe processes are terminated
+STOP_EVENT = threading.Event()
+RUNNING_PROCESSES = set()
+
 def handle_sigint(signum, frame):
+    if STOP_EVENT.is_set():
+        # Second interrupt: quit now instead of waiting for the pool workers
+        for process in list(RUNNING_PROCESSES):
+            process.kill()
+        sys.stdout.flush()
+        os._exit(130)
     logging.info("Interrupt received, stopping...")
-    sys.exit(0)
+    STOP_EVENT.set()
+    for process in list(RUNNING_PROCESSES):
+        process.terminate()
 
 signal.signal(signal.SIGINT, handle_sigint)
 
-def check_channel_status(url, timeout, retries=6, extended_timeout=None):
-    headers = {
-        'User-Agent': 'IPTVChecker 1.0'
-    }
+# Responses retried with exponential backoff (capped at 20s) or after the server's Retry-After
+RETRY_STATUSES = frozenset({408, 429, 500, 502, 503, 504, 507})
+RETRY_ATTEMPTS = 3
+# Failed connects and reads get one more try
+TRANSPORT_RETRIES = 1
+RETRY_MAX_DELAY = 20
+
+class CappedRetry(Retry):
+    # urllib3 sleeps for as long as Retry-After asks; don't let one server park a worker for minutes
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        return None if retry_after is None else min(retry_after, RETRY_MAX_DELAY)
+
+RETRY_POLICY = CappedRetry(
+    total=RETRY_ATTEMPTS, connect=TRANSPORT_RETRIES, read=TRANSPORT_RETRIES, status=RETRY_ATTEMPTS, status_forcelist=RETRY_STATUSES,
+    allowed_methods=frozenset({'GET'}), backoff_factor=1, backoff_max=RETRY_MAX_DELAY, backoff_jitter=1,
+    respect_retry_after_header=True, raise_on_status=False
+)
+
+# Shared session so channels on the same host reuse pooled connections instead of reconnecting
+SESSION = requests.Session()
+SESSION.headers['User-Agent'] = 'IPTVChecker 1.0'
+
+def mount_http_adapters(pool_size):
+    # At least one pooled connection per worker thread, so kept-alive sockets are reused
+    adapter = HTTPAdapter(pool_connections=32, pool_maxsize=pool_size, max_retries=RETRY_POLICY)
+    SESSION.mount('http://', adapter)
+    SESSION.mount('https://', adapter)
+
+mount_http_adapters(64)
+
+# Playlists usually point hundreds of channels at a handful of hosts, so resolve each host once
+DNS_CACHE_TTL = 300
+DNS_CACHE = {}
+system_getaddrinfo = socket.getaddrinfo
+
+def cached_getaddrinfo(host, port, family=0, type=0, proto=0, flags=0):
+    key = (host, port, family, type, proto, flags)
+    cached = DNS_CACHE.get(key)
+    if cached and time.monotonic() - cached[0] < DNS_CACHE_TTL:
+        return cached[1]
+    result = system_getaddrinfo(host, port, family, type, proto, flags)
+    DNS_CACHE[key] = (time.monotonic(), result)
+    return result
+
+# Limits how many ffmpeg/ffprobe processes run at the same time, see run_media_command
+FFMPEG_SEMAPHORE = threading.BoundedSemaphore(os.cpu_count() or 1)
+# Media workers per ffmpeg slot: while one worker runs ffprobe/ffmpeg, another downloads its next stream sample
+MEDIA_WORKERS_PER_PROCESS = 2
+
+def run_media_command(command, timeout, **kwargs):
+    with FFMPEG_SEMAPHORE:
+        if STOP_EVENT.is_set():
+            return subprocess.CompletedProcess(command, 1)
+        # Same as subprocess.run, but the process is tracked so an interrupt can terminate it
+        with subprocess.Popen(command, stdin=subprocess.DEVNULL, **kwargs) as process:
+            RUNNING_PROCESSES.add(process)
+            try:
+                # Ctrl+C may have arrived after the check above, when the handler couldn't see this process yet
+                if STOP_EVENT.is_set():
+                    process.terminate()
+                stdout, stderr = process.communicate(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.communicate()
+                raise
+            finally:
+                RUNNING_PROCESSES.discard(process)
+        return subprocess.CompletedProcess(command, process.returncode, stdout, stderr)
+
+# 1 MB / 1 s of input is enough for ffmpeg/ffprobe to find the streams (default 5 MB / 5 s)
+PROBE_LIMITS = ('-analyzeduration', '1000000', '-probesize', '1000000')
+
+# A live MPEG-TS stream is recognised from a short byte range instead of downloading the full threshold
+RANGE_PROBE_SIZE = 8192
+STREAM_SAMPLE_SIZE = 4 * 1024 * 1024  # Local copy used for ffprobe and the screenshot
+# After this long, sample downloads whose byte rate can't reach a usable sample in time are abandoned
+SAMPLE_RATE_CHECK_SECONDS = 3
+# Read size for stream bodies, both in the liveness probe and when saving a stream sample
+STREAM_CHUNK_SIZE = 16 * 1024
+# Without a Range response, a stream that has sent 64KB and is still sending after 1.5s counts as live
+MIN_LIVE_DATA = 64 * 1024
+MIN_LIVE_SECONDS = 1.5
+TS_PACKET_SIZE = 188
+TS_SYNC_BYTE = 0x47
+
+# Content types accepted as a stream; other responses only count when the URL's path names a .ts file
+STREAM_MEDIA_TYPES = frozenset({'video/mp2t', 'application/vnd.apple.mpegurl', 'application/x-mpegurl'})
+
+def is_mpegts_sample(data):
+    # Every 188-byte MPEG-TS packet starts with the 0x47 sync byte
+    if len(data) < TS_PACKET_SIZE * 3:
+        return False
+    return all(data[offset] == TS_SYNC_BYTE for offset in range(0, len(data) - TS_PACKET_SIZE + 1, TS_PACKET_SIZE))
+
+def check_channel_status(url, timeout, retries=3, extended_timeout=None):
     min_data_threshold = 1024 * 500  # 500KB minimum threshold
     initial_timeout = 5
     max_timeout = timeout
 
     def attempt_check(current_timeout):
-        accumulated_data = 0
-        stable_connection = True
+        request_headers = {'Range': f"bytes=0-{RANGE_PROBE_SIZE - 1}"}
         for attempt in range(retries):
+            if STOP_EVENT.is_set():
+                return 'Dead'
             try:
-                with requests.get(url, stream=True, timeout=(initial_timeout, current_timeout), headers=headers) as resp:
-                    if resp.status_code == 429:
-                        logging.debug(f"Rate limit exceeded, retrying...")
-                        time.sleep(2)
+                with SESSION.get(url, stream=True, timeout=(initial_timeout, current_timeout), headers=request_headers) as resp:
+                    # Rate limiting and transient server errors were already retried by RETRY_POLICY
+                    if resp.status_code == 416:
+                        logging.debug("Range request rejected, retrying with a plain GET")
+                        request_headers = None
                         continue
-                    elif resp.status_code == 200:
+                    elif resp.status_code in (200, 206):
                         content_type = resp.headers.get('Content-Type', '')
                         logging.debug(f"Content-Type: {content_type}")
 
-                        if 'video/mp2t' in content_type or '.ts' in url or 'application/vnd.apple.mpegurl' in content_type:
-                            for chunk in resp.iter_content(1024 * 1024):  # 1MB chunks
-                                if not chunk:
-                                    stable_connection = False
-                                    break
-
+                        media_type = content_type.partition(';')[0].strip().lower()
+                        if media_type in STREAM_MEDIA_TYPES or urlsplit(url).path.endswith('.ts'):
+                            if resp.status_code == 206:
+                                # The server honoured the Range header, so only a short sample was sent
+                                sample = next(resp.iter_content(RANGE_PROBE_SIZE), b'')
+                                logging.debug(f"Data received: {len(sample)} bytes")
+                                if is_mpegts_sample(sample):
+                                    return 'Alive'
+                                logging.debug("Range sample is not MPEG-TS, retrying with a plain GET")
+                                request_headers = None
+                                continue
+
+                            # Alive at the threshold, or once MIN_LIVE_DATA has arrived and MIN_LIVE_SECONDS have passed
+                            started = time.monotonic()
+                            accumulated_data = 0
+                            for chunk in resp.iter_content(STREAM_CHUNK_SIZE):
                                 accumulated_data += len(chunk)
-                                if accumulated_data >= min_data_threshold:
+                                if accumulated_data >= min_data_threshold or (
+                                        accumulated_data >= MIN_LIVE_DATA and time.monotonic() - started >= MIN_LIVE_SECONDS):
                                     logging.debug(f"Data received: {accumulated_data} bytes")
                                     return 'Alive'
-
+                                if STOP_EVENT.is_set():
+                                    return 'Dead'
                             logging.debug(f"Data received: {accumulated_data} bytes")
-                            if not stable_connection:
-                                logging.debug("Unstable connection detected")
-                                return 'Dead'
+                            # The response ended before the threshold; requesting it again won't change that
+                            logging.debug("Stream ended before enough data was received")
+                            return 'Dead'
                         else:
                             logging.debug(f"Content-Type not recognized as stream: {content_type}")
                             return 'Dead'
                     else:
                         logging.debug(f"HTTP status code not OK: {resp.status_code}")
                         return 'Dead'
+            # Transient connect/read failures have already been retried by RETRY_POLICY at this point
             except requests.ConnectionError:
                 logging.error("Connection error occurred")
                 return 'Dead'
@@ -100,171 +252,378 @@ def check_channel_status(url, timeout, retries=6, extended_timeout=None):
         logging.info(f"Channel initially detected as dead. Retrying with an extended timeout of {extended_timeout} seconds.")
         status = attempt_check(extended_timeout)
 
-    # Final Verification using ffmpeg/ffprobe for streams marked alive
-    if status == 'Alive':
-        try:
-            command = [
-                'ffmpeg', '-i', url, '-t', '5', '-f', 'null', '-'
-            ]
-            ffmpeg_result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=15)
-            if ffmpeg_result.returncode != 0:
-                logging.debug(f"ffmpeg failed to read stream; marking as dead")
-                status = 'Dead'
-        except subprocess.TimeoutExpired:
-            logging.error(f"Timeout when trying to verify stream with ffmpeg for {url}")
-            status = 'Dead'
-
+    # Whether the stream decodes is confirmed in the media step, by the screenshot or verify_stream
     return status
 
+def verify_stream(url):
+    # Final verification for streams no screenshot could be taken from: ffmpeg has to decode 5 seconds
+    try:
+        command = [
+            'ffmpeg', '-nostdin', *PROBE_LIMITS, '-i', url, '-t', '5', '-f', 'null', '-'
+        ]
+        ffmpeg_result = run_media_command(command, 15, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        if ffmpeg_result.returncode != 0:
+            logging.debug(f"ffmpeg failed to read stream; marking as dead")
+            return False
+        return True
+    except subprocess.TimeoutExpired:
+        logging.error(f"Timeout when trying to verify stream with ffmpeg for {url}")
+        return False
 
-def capture_frame(url, output_path, file_name):
+
+def download_stream_sample(url, timeout, sample_size=STREAM_SAMPLE_SIZE, max_duration=15):
+    # Saves the start of an MPEG-TS stream to a temporary file; returns None if no usable sample was fetched
+    started = time.monotonic()
+    min_sample_size = sample_size // 4
+    received = 0
+    sample_path = None
+    try:
+        with SESSION.get(url, stream=True, timeout=(5, timeout)) as resp:
+            if resp.status_code != 200:
+                return None
+            with tempfile.NamedTemporaryFile(suffix='.ts', delete=False) as sample_file:
+                sample_path = sample_file.name
+                for chunk in resp.iter_content(STREAM_CHUNK_SIZE):
+                    if STOP_EVENT.is_set():
+                        break
+                    if received == 0 and not is_mpegts_sample(chunk):
+                        break  # Not a raw TS stream (e.g. an HLS playlist), let ffmpeg handle the URL
+                    sample_file.write(chunk)
+                    received += len(chunk)
+                    elapsed = time.monotonic() - started
+                    if received >= sample_size or elapsed > max_duration:
+                        break
+                    # Too slow to deliver a usable sample in time; ffmpeg reads the URL instead
+                    if elapsed >= SAMPLE_RATE_CHECK_SECONDS and received * max_duration < min_sample_size * elapsed:
+                        break
+    except (requests.RequestException, OSError) as e:
+        logging.debug(f"Could not download stream sample: {str(e)}")
+        received = 0
+
+    if received < min_sample_size:
+        if sample_path:
+            os.remove(sample_path)
+        return None
+    logging.debug(f"Saved {received} byte sample of {url} to {sample_path}")
+    return sample_path
+
+
+# What ffprobe reports for an alive channel; fields stay "Unknown"/None when a stream can't be read
+StreamInfo = namedtuple('StreamInfo', ['video_info', 'resolution', 'fps', 'audio_info'])
+UNKNOWN_STREAM_INFO = StreamInfo("Unknown", "Unknown", None, "Unknown")
+
+# Minimum width and height for each resolution label, largest first; anything smaller is SD
+RESOLUTION_TIERS = (
+    (3840, 2160, "4K"),
+    (1920, 1080, "1080p"),
+    (1280, 720, "720p"),
+)
+
+def build_stream_info(codec_name, width, height, fps, audio_codec_name, audio_bitrate):
+    # Determine resolution string with FPS
+    resolution = "Unknown"
+    if width and height:
+        resolution = next((label for min_width, min_height, label in RESOLUTION_TIERS if width >= min_width and height >= min_height), "SD")
+
+    resolution_fps = f"{resolution}{fps}" if resolution != "Unknown" and fps else resolution
+    video_info = f"{resolution_fps} {codec_name}" if codec_name and resolution_fps else "Unknown"
+    audio_info = f"{audio_bitrate} kbps {audio_codec_name}" if audio_codec_name and audio_bitrate else "Unknown"
+    return StreamInfo(video_info, resolution, fps, audio_info)
+
+# ffmpeg's "Stream #0:0: Video: ..." input lines; the frame rate is "tbr", ffprobe's r_frame_rate
+VIDEO_STREAM_PATTERN = re.compile(r'Stream #\d+:\d+.*?: Video: (\w+).*?, (\d+)x(\d+)(?:.*?, ([\d.]+) tbr)?')
+AUDIO_STREAM_PATTERN = re.compile(r'Stream #\d+:\d+.*?: Audio: (\w+)(?:.*?, (\d+) kb/s)?')
+
+def parse_ffmpeg_stream_info(stderr):
+    # Stream details from the screenshot ffmpeg run; None unless everything get_stream_info reports is there
+    video_match = VIDEO_STREAM_PATTERN.search(stderr)
+    if not video_match or not video_match.group(4):
+        return None
+    audio_match = AUDIO_STREAM_PATTERN.search(stderr)
+    if audio_match and not audio_match.group(2):
+        return None
+    codec_name, width, height, fps = video_match.groups()
+    audio_codec_name, audio_bitrate = audio_match.groups() if audio_match else (None, None)
+    return build_stream_info(
+        codec_name.upper(), int(width), int(height), round(float(fps)),
+        audio_codec_name.upper() if audio_codec_name else None, int(audio_bitrate) if audio_bitrate else None
+    )
+
+# Characters that can't appear in screenshot file names on common filesystems
+FILENAME_TRANSLATION = str.maketrans({'/': '-', '\\': '-', ':': '-'})
+
+# Serializes appends when screenshots are collected in a single tar archive (-archive)
+ARCHIVE_LOCK = threading.Lock()
+
+# Encoder arguments per screenshot format; JPEG takes a fraction of PNG's encoding time
+SCREENSHOT_ENCODERS = {
+    'png': ('-vcodec', 'png'),
+    'jpg': ('-vcodec', 'mjpeg', '-q:v', '4'),
+}
+
+def capture_frame(url, output_path, file_names, archive=None, image_format='png'):
+    # Returns whether a screenshot was saved under every file name, and the stream details ffmpeg logged
+    file_name = file_names[0]
+    image_names = [f"{name}.{image_format}" for name in file_names]
+    output_file = os.path.join(output_path, image_names[0])
+    # Input seek and keyframe-only decoding
     command = [
-        'ffmpeg', '-y', '-i', url, '-ss', '00:00:02', '-frames:v', '1',
-        os.path.join(output_path, f"{file_name}.png")
+        'ffmpeg', '-nostdin', '-hide_banner', '-y', *PROBE_LIMITS,
+        '-ss', '00:00:02', '-skip_frame', 'nokey', '-i', url, '-frames:v', '1', '-an', '-sn',
+        *SCREENSHOT_ENCODERS[image_format]
     ]
+    if archive is not None:
+        command += ['-f', 'image2pipe', 'pipe:1']
+    else:
+        # Created on the first capture, so runs without a live channel don't leave an empty folder behind
+        os.makedirs(output_path, exist_ok=True)
+        command.append(output_file)
     try:
-        subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=30)
+        # stdout only carries the image when writing to the archive; stderr has the stream details
+        stdout = subprocess.PIPE if archive is not None else subprocess.DEVNULL
+        result = run_media_command(command, 30, stdout=stdout, stderr=subprocess.PIPE)
+        stream_info = parse_ffmpeg_stream_info((result.stderr or b'').decode('utf-8', 'replace'))
+        if archive is not None:
+            if not result.stdout:
+                logging.debug(f"ffmpeg did not produce a screenshot for {file_name}")
+                return False, stream_info
+            with ARCHIVE_LOCK:
+                for image_name in image_names:
+                    member = tarfile.TarInfo(image_name)
+                    member.size = len(result.stdout)
+                    member.mtime = int(time.time())
+                    archive.addfile(member, io.BytesIO(result.stdout))
+        # The exit status matters too: the file may be a screenshot left behind by an earlier run
+        elif result.returncode != 0 or not os.path.exists(output_file):
+            logging.debug(f"ffmpeg did not produce a screenshot for {file_name}")
+            return False, stream_info
+        else:
+            for image_name in image_names[1:]:
+                shutil.copyfile(output_file, os.path.join(output_path, image_name))
         logging.debug(f"Screenshot saved for {file_name}")
-        return True
+        return True, stream_info
     except subprocess.TimeoutExpired:
         logging.error(f"Timeout when trying to capture frame for {file_name}")
-        return False
-
+        return False, None
 
 def get_stream_info(url):
+    # A single ffprobe run reports both the video and the audio streams
     command = [
-        'ffprobe', '-v', 'error', '-select_streams', 'v:0', '-show_entries', 
-        'stream=codec_name,width,height,r_frame_rate', '-of', 'default=noprint_wrappers=1', url
+        'ffprobe', '-v', 'error', *PROBE_LIMITS, '-show_entries',
+        'stream=codec_type,codec_name,width,height,r_frame_rate,bit_rate', '-of', 'json', url
     ]
     try:
-        result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=10)
-        output = result.stdout.decode()
-        codec_name = None
-        width = height = None
-        fps = None
-        for line in output.splitlines():
-            if line.startswith("codec_name="):
-                codec_name = line.split('=')[1].upper()
-            elif line.startswith("width="):
-                width = int(line.split('=')[1])
-            elif line.startswith("height="):
-                height = int(line.split('=')[1])
-            elif line.startswith("r_frame_rate="):
-                fps_data = line.split('=')[1]
-                if fps_data and '/' in fps_data:
-                    numerator, denominator = map(int, fps_data.split('/'))
-                    fps = round(numerator / denominator)
-
-        # Determine resolution string with FPS
-        resolution = "Unknown"
-        if width and height:
-            if width >= 3840 and height >= 2160:
-                resolution = "4K"
-            elif width >= 1920 and height >= 1080:
-                resolution = "1080p"
-            elif width >= 1280 and height >= 720:
-                resolution = "720p"
-            else:
-                resolution = "SD"
+        result = run_media_command(command, 10, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        streams = json_loads(result.stdout or b'{}').get('streams', [])
 
-        resolution_fps = f"{resolution}{fps}" if resolution != "Unknown" and fps else resolution
+        video_stream = next((stream for stream in streams if stream.get('codec_type') == 'video'), {})
+        audio_stream = next((stream for stream in streams if stream.get('codec_type') == 'audio'), {})
 
-        return f"{resolution_fps} {codec_name}" if codec_name and resolution_fps else "Unknown", resolution, fps
-    except subprocess.TimeoutExpired:
-        logging.error(f"Timeout when trying to get stream info for {url}")
-        return "Unknown", "Unknown", None
+        codec_name = video_stream.get('codec_name', '').upper() or None
+        width = video_stream.get('width')
+        height = video_stream.get('height')
+        fps = None
+        fps_data = video_stream.get('r_frame_rate')
+        if fps_data and '/' in fps_data:
+            numerator, denominator = map(int, fps_data.split('/'))
+            # ffprobe reports "0/0" when it couldn't work out the frame rate
+            fps = round(numerator / denominator) if denominator else None
 
-def get_audio_bitrate(url):
-    command = [
-        'ffprobe', '-v', 'error', '-select_streams', 'a:0', '-show_entries',
-        'stream=codec_name,bit_rate', '-of', 'default=noprint_wrappers=1', url
-    ]
-    try:
-        result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=10)
-        output = result.stdout.decode()
+        audio_codec_name = audio_stream.get('codec_name', '').upper() or None
         audio_bitrate = None
-        codec_name = None
-        for line in output.splitlines():
-            if line.startswith("bit_rate="):
-                bitrate_value = line.split('=')[1]
-                if bitrate_value.isdigit():
-                    audio_bitrate = int(bitrate_value) // 1000  # Convert to kbps
-                else:
-                    audio_bitrate = 'N/A'
-            elif line.startswith("codec_name="):
-                codec_name = line.split('=')[1].upper()
+        if 'bit_rate' in audio_stream:
+            bitrate_value = str(audio_stream['bit_rate'])
+            if bitrate_value.isdigit():
+                audio_bitrate = int(bitrate_value) // 1000  # Convert to kbps
+            else:
+                audio_bitrate = 'N/A'
 
-        return f"{audio_bitrate} kbps {codec_name}" if codec_name and audio_bitrate else "Unknown"
+        return build_stream_info(codec_name, width, height, fps, audio_codec_name, audio_bitrate)
     except subprocess.TimeoutExpired:
-        logging.error(f"Timeout when trying to get audio bitrate for {url}")
-        return "Unknown"
+        logging.error(f"Timeout when trying to get stream info for {url}")
+        return UNKNOWN_STREAM_INFO
+
+# Resolution tags looked for in channel names, highest precedence first, with the resolutions each allows
+LABEL_PATTERN = re.compile(r'4k|uhd|1080p|fhd|hd', re.IGNORECASE)
+LABEL_RESOLUTIONS = {
+    '4k': ("4K",),
+    'uhd': ("4K",),
+    '1080p': ("1080p",),
+    'fhd': ("1080p",),
+    'hd': ("720p", "1080p"),
+}
 
 def check_label_mismatch(channel_name, resolution):
-    channel_name_lower = channel_name.lower()
-
     mismatches = []
 
-    # Compare resolution ignoring the framerate part
-    if "4k" in channel_name_lower or "uhd" in channel_name_lower:
-        if resolution != "4K":
-            mismatches.append(f"\033[91mExpected 4K, got {resolution}\033[0m")
-    elif "1080p" in channel_name_lower or "fhd" in channel_name_lower:
-        if resolution != "1080p":
-            mismatches.append(f"\033[91mExpected 1080p, got {resolution}\033[0m")
-    elif "hd" in channel_name_lower:
-        if resolution not in ["1080p", "720p"]:
-            mismatches.append(f"\033[91mExpected 720p or 1080p, got {resolution}\033[0m")
+    # One scan finds every tag in the name; the highest-precedence tag decides what's expected
+    labels = {label.lower() for label in LABEL_PATTERN.findall(channel_name)}
+    label = next((label for label in LABEL_RESOLUTIONS if label in labels), None)
+    if label:
+        expected = LABEL_RESOLUTIONS[label]
+        if resolution not in expected:
+            mismatches.append(f"Expected {' or '.join(expected)}, got {resolution}")
     elif resolution == "4K":
-        mismatches.append(f"\033[91m4K channel not labeled as such\033[0m")
+        mismatches.append("4K channel not labeled as such")
 
     return mismatches
 
+def url_cache_key(url):
+    # Scheme and host names are case-insensitive, so "HTTP://Host/x" and "http://host/x" are the same stream
+    parts = urlsplit(url)
+    userinfo, at, host = parts.netloc.rpartition('@')
+    return parts._replace(scheme=parts.scheme.lower(), netloc=userinfo + at + host.lower()).geturl()
+
+def channel_key(channel_name, url):
+    # Channels are identified in the check log by a SHA-1 of their name and URL
+    return hashlib.sha1(f"{channel_name} {url}".encode('utf-8')).digest()
+
 def load_processed_channels(log_file):
-    processed_channels = set()
-    last_index = 0
+    # Each log line is a JSON object with the channel's number, key (hex), name and check result
+    processed_channels = {}
     if os.path.exists(log_file):
-        with open(log_file, 'r') as f:
+        with open(log_file, 'r', encoding='utf-8') as f:
             for line in f:
-                parts = line.strip().split(' - ')
-                if len(parts) > 1:
-                    index_part = parts[0].split()[0]
-                    if index_part.isdigit():
-                        last_index = max(last_index, int(index_part))
-                    processed_channels.add(parts[1])
-    return processed_channels, last_index
-
-def write_log_entry(log_file, entry):
-    with open(log_file, 'a') as f:
-        f.write(entry + "\n")
+                try:
+                    entry = json_loads(line)
+                    processed_channels[bytes.fromhex(entry['key'])] = entry
+                except (ValueError, KeyError, TypeError):
+                    logging.debug(f"Skipping unreadable check log line: {line.rstrip()}")  # Cut short by a crash
+    return processed_channels
+
+def log_writer(log_file, entries):
+    # Runs on its own thread, writing queued entries in batches until a None entry arrives
+    with open(log_file, 'a', encoding='utf-8') as f:
+        if f.tell():
+            with open(log_file, 'rb') as existing:
+                existing.seek(-1, os.SEEK_END)
+                if existing.read(1) != b'\n':
+                    f.write('\n')  # Ends a line cut short by a crash, so the next entry stays readable
+        stopping = False
+        while not stopping:
+            batch = [entries.get()]
+            while not entries.empty():
+                batch.append(entries.get_nowait())
+            if None in batch:
+                stopping = True
+                batch = batch[:batch.index(None)]
+            f.write(''.join(f"{entry}\n" for entry in batch))
+            f.flush()
 
 def console_log_entry(current_channel, total_channels, channel_name, status, video_info, audio_info, max_name_length, use_padding):
-    color = "\033[92m" if status == 'Alive' else "\033[91m"
-    status_symbol = '✓' if status == 'Alive' else '✕'
     if use_padding:
         name_padding = ' ' * (max_name_length - len(channel_name) + 3)  # +3 for additional spaces
     else:
         name_padding = ''
     if status == 'Alive':
-        print(f"{color}{current_channel}/{total_channels} {status_symbol} {channel_name}{name_padding} | Video: {video_info} - Audio: {audio_info}\033[0m")
-        logging.info(f"{current_channel}/{total_channels} {status_symbol} {channel_name}{name_padding} | Video: {video_info} - Audio: {audio_info}")
+        color = ALIVE_COLOR
+        message = f"{current_channel}/{total_channels} ✓ {channel_name}{name_padding} | Video: {video_info} - Audio: {audio_info}"
     else:
-        if use_padding:
-            # Include the | for dead links only when padding is added
-            print(f"{color}{current_channel}/{total_channels} {status_symbol} {channel_name}{name_padding} |\033[0m")
-            logging.info(f"{current_channel}/{total_channels} {status_symbol} {channel_name}{name_padding} |")
-        else:
-            print(f"{color}{current_channel}/{total_channels} {status_symbol} {channel_name}\033[0m")
-            logging.info(f"{current_channel}/{total_channels} {status_symbol} {channel_name}")
-
-def parse_m3u8_file(file_path, group_title, timeout, log_file, extended_timeout, split=False, rename=False):
-    base_playlist_name = os.path.basename(file_path).split('.')[0]
+        color = DEAD_COLOR
+        # Include the | for dead links only when padding is added
+        message = f"{current_channel}/{total_channels} ✕ {channel_name}{name_padding}{' |' if use_padding else ''}"
+    sys.stdout.write(f"{color}{message}{RESET_COLOR}\n")
+    logging.info(message)
+
+def compile_extinf_matcher(group_title):
+    # Returns the test applied to every playlist line
+    if group_title:
+        return re.compile(r'#EXTINF.*?' + re.escape(group_title)).match
+    return lambda line: line.startswith('#EXTINF')
+
+def write_playlist(path, lines):
+    # Joined up front so each output playlist is written with a single call
+    with open(path, 'w', encoding='utf-8') as playlist_file:
+        playlist_file.write("#EXTM3U\n" + ''.join(f"{line}\n" for line in lines))
+
+def inspect_channel(url, channels, timeout, output_folder, screenshot_archive=None, image_format='png'):
+    # Stream details and screenshots for an alive URL's channels; None if ffmpeg can't decode the stream
+    if STOP_EVENT.is_set():
+        return UNKNOWN_STREAM_INFO
+    sample_path = download_stream_sample(url, timeout)
+    try:
+        file_names = [f"{channel_number}-{channel_name.translate(FILENAME_TRANSLATION)}" for channel_number, _, _, _, channel_name in channels]
+        captured, stream_info = capture_frame(sample_path or url, output_folder, file_names, screenshot_archive, image_format)
+        if not captured and sample_path:
+            # The sample may be too short to reach the capture point; fall back to the live stream
+            captured, live_stream_info = capture_frame(url, output_folder, file_names, screenshot_archive, image_format)
+            stream_info = stream_info or live_stream_info
+        if not captured and not verify_stream(url):
+            return None
+        if stream_info is None:
+            # ffmpeg's log didn't have everything (e.g. no audio bitrate); ask ffprobe
+            stream_info = get_stream_info(sample_path or url)
+    finally:
+        if sample_path:
+            os.remove(sample_path)
+    return stream_info
+
+def check_channels(channels, timeout, extended_timeout, workers, media_workers, output_folder, screenshot_archive, image_format):
+    # Probes, then inspects alive channels on a second pool; yields (channel, status, stream info) as they finish
+    probe_executor = ThreadPoolExecutor(max_workers=workers)
+    media_executor = ThreadPoolExecutor(max_workers=(media_workers or os.cpu_count() or 1) * MEDIA_WORKERS_PER_PROCESS)
+    probe_futures = {}  # Probe future -> every channel with that URL
+    media_futures = {}
+    url_futures = {}
+    for channel in channels:
+        next_line = channel[3]
+        # Playlists often list one stream under several names; its URL is only probed once
+        url_key = url_cache_key(next_line)
+        future = url_futures.get(url_key)
+        if future is None:
+            future = url_futures[url_key] = probe_executor.submit(check_channel_status, next_line, timeout, extended_timeout=extended_timeout)
+            probe_futures[future] = []
+        probe_futures[future].append(channel)
+    try:
+        pending = set(probe_futures)
+        while pending and not STOP_EVENT.is_set():
+            # Wake up regularly so an interrupt is noticed even while every channel is still busy
+            done, pending = wait(pending, timeout=1, return_when=FIRST_COMPLETED)
+            if STOP_EVENT.is_set():
+                break  # Results cut short by the interrupt are not reported or logged
+            for future in done:
+                if future in media_futures:
+                    url_channels = media_futures.pop(future)
+                    try:
+                        stream_info = future.result()
+                    except Exception as e:
+                        logging.error(f"Inspecting {url_channels[0][4]} failed: {e}")
+                        stream_info = UNKNOWN_STREAM_INFO
+                    # None means the probe accepted the stream, but ffmpeg couldn't decode it
+                    status = 'Alive' if stream_info is not None else 'Dead'
+                    for channel in url_channels:
+                        yield channel, status, stream_info or UNKNOWN_STREAM_INFO
+                    continue
+
+                url_channels = probe_futures.pop(future)
+                try:
+                    status = future.result()
+                except Exception as e:
+                    # One channel failing unexpectedly shouldn't end the whole run
+                    logging.error(f"Checking {url_channels[0][4]} failed: {e}")
+                    status = 'Dead'
+                if status != 'Alive':
+                    for channel in url_channels:
+                        yield channel, status, UNKNOWN_STREAM_INFO
+                    continue
+                # The stream is inspected once; every channel with that URL shares the result and the screenshot
+                media_future = media_executor.submit(inspect_channel, url_channels[0][3], url_channels, timeout, output_folder, screenshot_archive, image_format)
+                media_futures[media_future] = url_channels
+                pending.add(media_future)
+    finally:
+        # Don't start work that is still queued if we bail out early
+        for future in list(probe_futures) + list(media_futures):
+            future.cancel()
+        probe_executor.shutdown(wait=False)
+        media_executor.shutdown(wait=False)
+
+def parse_m3u8_file(file_path, base_playlist_name, group_title, timeout, log_file, extended_timeout, split=False, rename=False, workers=8, media_workers=None, archive=False, shard=None, image_format='png'):
     group_name = group_title.replace('|', '').replace(' ', '') if group_title else 'AllGroups'
     output_folder = f"{base_playlist_name}_{group_name}_screenshots"
-    os.makedirs(output_folder, exist_ok=True)
 
-    processed_channels, last_index = load_processed_channels(log_file)
-    current_channel = last_index
+    processed_channels = load_processed_channels(log_file)
     mislabeled_channels = []
+    # (channel number, summary line) pairs; channels finish out of order, so these are sorted when printed
     low_framerate_channels = []
     max_name_length = 0
     use_padding = True
@@ -277,116 +636,139 @@ def parse_m3u8_file(file_path, group_title, timeout, log_file, extended_timeout,
 
     try:
         with open(file_path, 'r', encoding='utf-8') as file:
-            lines = file.readlines()
-            total_channels = sum(1 for line in lines if line.startswith('#EXTINF') and (group_title in line if group_title else True))
-
             logging.info(f"Loading channels from {file_path} with group '{group_title}'...")
-            logging.info(f"Total channels matching group '{group_title}': {total_channels}\n")
 
-            # Calculate the maximum channel name length and check if the formatted line will fit in the console width
-            for i in range(len(lines)):
-                line = lines[i].strip()
-                if line.startswith('#EXTINF') and (group_title in line if group_title else True):
-                    if i + 1 < len(lines):
-                        channel_name = line.split(',', 1)[1].strip() if ',' in line else "Unknown Channel"
+            # Single pass over the playlist; its lines are only kept for -rename
+            total_channels = 0
+            matched_channels = 0
+            line_count = 0
+            renamed_lines = []
+            pending_channels = []
+            cached_channels = []
+            is_channel_line = compile_extinf_matcher(group_title)
+            lines = iter(file)
+            for line in lines:
+                line = line.strip()
+                if is_channel_line(line):
+                    matched_channels += 1
+                    # With -shard K/N only every Nth matching channel, starting at the Kth, belongs to this run
+                    in_shard = not shard or (matched_channels - shard[0]) % shard[1] == 0
+                    if in_shard:
+                        total_channels += 1
+                    next_line = next(lines, None)
+                    if next_line is not None:
+                        next_line = next_line.strip()
+                        _, comma, channel_name = line.partition(',')
+                        channel_name = channel_name.strip() if comma else "Unknown Channel"
                         max_name_length = max(max_name_length, len(channel_name))
+                        key = channel_key(channel_name, next_line)
+                        if in_shard:
+                            # Channels are numbered by playlist position, so a resumed run keeps the same numbers
+                            channel = (total_channels, line_count, line, next_line, channel_name)
+                            if key not in processed_channels:
+                                pending_channels.append(channel)
+                            elif processed_channels[key]:
+                                # Checked by an earlier run; its logged result is reported again without probing
+                                cached_channels.append((channel, processed_channels[key]))
+                            # Duplicates of a channel seen earlier in the playlist are only checked once
+                            processed_channels[key] = None
+
+                        # Add the EXTINF line and the corresponding URL to the list
+                        if rename:
+                            renamed_lines += (line, next_line)
+                        line_count += 2
+                        continue
+                # Any other line (or an EXTINF line without a URL after it) is kept as is
+                if rename:
+                    renamed_lines.append(line)
+                line_count += 1
+
+            logging.info(f"Total channels matching group '{group_title}': {total_channels}\n")
 
             # Estimate if the line will fit in the console width
             max_line_length = max_name_length + len("1/5 ✓ | Video: 1080p50 H264 - Audio: 160 kbps AAC") + 3  # 3 for extra padding
             if max_line_length > console_width:
                 use_padding = False
 
-            renamed_lines = []
-            i = 0
-            while i < len(lines):
-                line = lines[i].strip()
-                if line.startswith('#EXTINF') and (group_title in line if group_title else True):
-                    if i + 1 < len(lines):
-                        next_line = lines[i + 1].strip()
-                        channel_name = line.split(',', 1)[1].strip() if ',' in line else "Unknown Channel"
-                        identifier = f"{channel_name} {next_line}"
-                        if identifier not in processed_channels:
-                            current_channel += 1
-                            status = check_channel_status(next_line, timeout, extended_timeout=extended_timeout)
-                            video_info = "Unknown"
-                            audio_info = "Unknown"
-                            fps = None
-                            if status == 'Alive':
-                                video_info, resolution, fps = get_stream_info(next_line)
-                                audio_info = get_audio_bitrate(next_line)
-                                mismatches = check_label_mismatch(channel_name, resolution)
-                                if fps is not None and fps <= 30:
-                                    low_framerate_channels.append(f"{current_channel}/{total_channels} {channel_name} - \033[91m{fps}fps\033[0m")
-                                if mismatches:
-                                    mislabeled_channels.append(f"{current_channel}/{total_channels} {channel_name} - \033[91m{', '.join(mismatches)}\033[0m")
-                                file_name = f"{current_channel}-{channel_name.replace('/', '-')}"  # Replace '/' to avoid path issues
-                                capture_frame(next_line, output_folder, file_name)
-                                
-                                if rename:
-                                    # Create the new channel name in the desired format
-                                    renamed_channel_name = f"{channel_name} ({resolution} {video_info.split()[-1]} | {audio_info})"
-                                    extinf_parts = line.split(',', 1)
-                                    if len(extinf_parts) > 1:
-                                        extinf_parts[1] = renamed_channel_name
-                                        line = ','.join(extinf_parts)
-
-                                if split:
-                                    working_channels.append((line, next_line))
-                            else:
-                                if split:
-                                    dead_channels.append((line, next_line))
-                            console_log_entry(current_channel, total_channels, channel_name, status, video_info, audio_info, max_name_length, use_padding)
-                            processed_channels.add(identifier)
-
-                        # Add the processed (renamed) line and the corresponding URL to the list
-                        renamed_lines.append(line)
-                        renamed_lines.append(next_line)
-                        i += 1  # Skip the next line because it's already processed
-                    else:
-                        # If there's no URL following the EXTINF line, just add it
-                        renamed_lines.append(line)
+            # Screenshots go into one tar file instead of a file per channel; 'a' keeps earlier runs' captures
+            screenshot_archive = tarfile.open(f"{output_folder}.tar", 'a') if archive else None
+            log_entries = queue.Queue()
+            log_thread = threading.Thread(target=log_writer, args=(log_file, log_entries), daemon=True)
+            log_thread.start()
+
+            def report_channel(channel, status, stream_info):
+                # Adds a finished channel to the console output, the summaries and the output playlists
+                video_info, resolution, fps, audio_info = stream_info
+                channel_number, line_index, line, next_line, channel_name = channel
+                if status == 'Alive':
+                    mismatches = check_label_mismatch(channel_name, resolution)
+                    if fps is not None and fps <= 30:
+                        low_framerate_channels.append((channel_number, f"{channel_number}/{total_channels} {channel_name} - {DEAD_COLOR}{fps}fps{RESET_COLOR}"))
+                    if mismatches:
+                        mislabeled_channels.append((channel_number, f"{channel_number}/{total_channels} {channel_name} - {DEAD_COLOR}{', '.join(mismatches)}{RESET_COLOR}"))
+
+                    if rename:
+                        # Create the new channel name in the desired format
+                        renamed_channel_name = f"{channel_name} ({resolution} {video_info.split()[-1]} | {audio_info})"
+                        extinf_parts = line.split(',', 1)
+                        if len(extinf_parts) > 1:
+                            extinf_parts[1] = renamed_channel_name
+                            line = ','.join(extinf_parts)
+                            renamed_lines[line_index] = line
+
+                    if split:
+                        working_channels.append((line_index, line, next_line))
                 else:
-                    # If it's not an EXTINF line, just keep it as is
-                    renamed_lines.append(line)
-                i += 1
+                    if split:
+                        dead_channels.append((line_index, line, next_line))
+                console_log_entry(channel_number, total_channels, channel_name, status, video_info, audio_info, max_name_length, use_padding)
+
+            for channel, entry in cached_channels:
+                report_channel(channel, entry['status'], StreamInfo(entry['video'], entry['resolution'], entry['fps'], entry['audio']))
+
+            try:
+                with closing(check_channels(pending_channels, timeout, extended_timeout, workers, media_workers, output_folder, screenshot_archive, image_format)) as results:
+                    for channel, status, stream_info in results:
+                        report_channel(channel, status, stream_info)
+                        channel_number, _, _, next_line, channel_name = channel
+                        log_entries.put(json.dumps({
+                            'number': channel_number, 'key': channel_key(channel_name, next_line).hex(), 'name': channel_name,
+                            'status': status, 'video': stream_info.video_info, 'resolution': stream_info.resolution,
+                            'fps': stream_info.fps, 'audio': stream_info.audio_info
+                        }, ensure_ascii=False))
+            finally:
+                log_entries.put(None)
+                log_thread.join()
+                if screenshot_archive is not None:
+                    screenshot_archive.close()
 
             if split:
                 working_playlist_path = f"{base_playlist_name}_working.m3u8"
                 dead_playlist_path = f"{base_playlist_name}_dead.m3u8"
-                with open(working_playlist_path, 'w', encoding='utf-8') as working_file:
-                    working_file.write("#EXTM3U\n")
-                    for entry in working_channels:
-                        working_file.write(entry[0] + "\n")
-                        working_file.write(entry[1] + "\n")
-                with open(dead_playlist_path, 'w', encoding='utf-8') as dead_file:
-                    dead_file.write("#EXTM3U\n")
-                    for entry in dead_channels:
-                        dead_file.write(entry[0] + "\n")
-                        dead_file.write(entry[1] + "\n")
+                # Channels finish out of order; write them back in playlist order
+                write_playlist(working_playlist_path, (part for _, extinf_line, url in sorted(working_channels) for part in (extinf_line, url)))
+                write_playlist(dead_playlist_path, (part for _, extinf_line, url in sorted(dead_channels) for part in (extinf_line, url)))
                 logging.info(f"Working channels playlist saved to {working_playlist_path}")
                 logging.info(f"Dead channels playlist saved to {dead_playlist_path}")
             elif rename:  # Save the renamed playlist directly if split is not enabled
                 renamed_playlist_path = f"{base_playlist_name}_renamed.m3u8"
-                with open(renamed_playlist_path, 'w', encoding='utf-8') as renamed_file:
-                    renamed_file.write("#EXTM3U\n")
-                    for line in renamed_lines:
-                        renamed_file.write(line + "\n")
+                write_playlist(renamed_playlist_path, renamed_lines)
                 logging.info(f"Renamed playlist saved to {renamed_playlist_path}")
 
             if low_framerate_channels:
-                print("\n\033[93mLow Framerate Channels:\033[0m")
-                for entry in low_framerate_channels:
+                print(f"\n{WARNING_COLOR}Low Framerate Channels:{RESET_COLOR}")
+                for _, entry in sorted(low_framerate_channels):
                     print(f"{entry}")
                 logging.info("Low Framerate Channels Detected:")
-                for entry in low_framerate_channels:
+                for _, entry in sorted(low_framerate_channels):
                     logging.info(entry)
 
             if mislabeled_channels:
-                print("\n\033[93mMislabeled Channels:\033[0m")
-                for entry in mislabeled_channels:
+                print(f"\n{WARNING_COLOR}Mislabeled Channels:{RESET_COLOR}")
+                for _, entry in sorted(mislabeled_channels):
                     print(f"{entry}")
                 logging.info("Mislabeled Channels Detected:")
-                for entry in mislabeled_channels:
+                for _, entry in sorted(mislabeled_channels):
                     logging.info(entry)
 
     except FileNotFoundError:
@@ -395,6 +777,27 @@ def parse_m3u8_file(file_path, group_title, timeout, log_file, extended_timeout,
         logging.error(f"An unexpected error occurred while processing the file: {str(e)}")
 
 
+def positive_int(value):
+    # Pool sizes: "-workers 0" would leave a pool without any threads
+    number = int(value) if value.isdigit() else 0
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"expected a positive whole number, got '{value}'")
+    return number
+
+def parse_shard(value):
+    # "-shard 2/4" checks the second of four interleaved slices of the playlist
+    index, _, count = value.partition('/')
+    if not (index.isdigit() and count.isdigit() and 1 <= int(index) <= int(count)):
+        raise argparse.ArgumentTypeError(f"expected K/N with 1 <= K <= N, got '{value}'")
+    return int(index), int(count)
+
+def output_base_name(file_path, shard):
+    # Prefix of the log, screenshot and playlist names, with the shard in it
+    base_name = os.path.basename(file_path).split('.')[0]
+    if shard:
+        base_name += f"_shard{shard[0]}of{shard[1]}"
+    return base_name
+
 def main():
     print_header()
 
@@ -406,21 +809,33 @@ def main():
     parser.add_argument("-extended", "-e", type=int, nargs='?', const=10, default=None, help="Enable extended timeout check for dead channels. Default is 10 seconds if used without specifying time.")
     parser.add_argument("-split", "-s", action="store_true", help="Create separate playlists for working and dead channels")
     parser.add_argument("-rename", "-r", action="store_true", help="Rename alive channels to include video and audio info")
+    parser.add_argument("-archive", "-a", action="store_true", help="Store screenshots in a single .tar archive instead of individual image files")
+    parser.add_argument("-jpeg", "-j", action="store_true", help="Save screenshots as JPEG instead of PNG, which is much faster to encode")
+    parser.add_argument("-workers", "-w", type=positive_int, default=8, help="Number of channels to check concurrently. Default is 8.")
+    parser.add_argument("-ffmpeg-workers", type=positive_int, default=os.cpu_count() or 1, help="Maximum number of ffmpeg/ffprobe processes running at once. Defaults to the number of CPU cores.")
+    parser.add_argument("-fresh", "-f", action="store_true", help="Ignore results saved by earlier runs and check every channel again")
+    parser.add_argument("-shard", type=parse_shard, default=None, metavar="K/N", help="Only check the Kth of N interleaved slices of the playlist, so N machines can share one playlist")
 
     args = parser.parse_args()
 
     # Set up logging based on verbosity level
-    if args.v == 1:
-        logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
-    elif args.v >= 2:
-        logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
-    else:
-        logging.basicConfig(level=logging.CRITICAL)  # Only critical errors will be logged by default.
+    setup_logging(args.v)
+
+    global FFMPEG_SEMAPHORE
+    FFMPEG_SEMAPHORE = threading.BoundedSemaphore(args.ffmpeg_workers)
+
+    mount_http_adapters(max(64, args.workers + args.ffmpeg_workers * MEDIA_WORKERS_PER_PROCESS))
+
+    # Route the HTTP probes' name lookups through the cache
+    socket.getaddrinfo = cached_getaddrinfo
 
     group_name = args.group.replace('|', '').replace(' ', '') if args.group else 'AllGroups'
-    log_file_name = f"{os.path.basename(args.playlist).split('.')[0]}_{group_name}_checklog.txt"
+    base_playlist_name = output_base_name(args.playlist, args.shard)
+    log_file_name = f"{base_playlist_name}_{group_name}_checklog.txt"
+    if args.fresh and os.path.exists(log_file_name):
+        os.remove(log_file_name)
 
-    parse_m3u8_file(args.playlist, args.group, args.timeout, log_file_name, extended_timeout=args.extended, split=args.split, rename=args.rename)
+    parse_m3u8_file(args.playlist, base_playlist_name, args.group, args.timeout, log_file_name, extended_timeout=args.extended, split=args.split, rename=args.rename, workers=args.workers, media_workers=args.ffmpeg_workers, archive=args.archive, shard=args.shard, image_format='jpg' if args.jpeg else 'png')
 
 if __name__ == "__main__":
     main()